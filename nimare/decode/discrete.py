@@ -2,19 +2,98 @@
 Methods for decoding subsets of voxels (e.g., ROIs) or experiments (e.g., from
 meta-analytic clustering on a database) into text.
 """
+from collections import namedtuple
+
 import numpy as np
 import pandas as pd
 import nibabel as nib
-from scipy.stats import binom
 from scipy import special
-from statsmodels.sandbox.stats.multicomp import multipletests
 
 from .utils import weight_priors
-from ..stats import p_to_z, one_way, two_way
+from ..stats import one_way, two_way
 from ..due import due
 from .. import references
 
 
+def _fdr_bh(p):
+    """
+    Benjamini-Hochberg FDR-corrected p-values. Matches statsmodels'
+    multipletests(method='fdr_bh'), but computes only the corrected
+    p-values, skipping the rejection mask and adjusted alphas that the
+    decoders discard.
+    """
+    p = np.asarray(p)
+    n_tests = p.size
+    order = np.argsort(p)
+    ranked = p[order] * n_tests / np.arange(1, n_tests + 1)
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    p_corr = np.empty(n_tests)
+    p_corr[order] = np.minimum(ranked, 1.)
+    return p_corr
+
+
+def _get_mask_vec(model):
+    """
+    Return the model mask as a flattened boolean vector, cached on the
+    model since it is fixed across calls.
+    """
+    mask_vec = getattr(model, '_mask_vec', None)
+    if mask_vec is None:
+        mask_vec = np.asarray(model.mask.dataobj, dtype=bool).ravel()
+        model._mask_vec = mask_vec
+    return mask_vec
+
+
+def _roi_to_vec(model, roi, mask_vec):
+    """
+    Convert a single ROI (image, path, or pre-flattened boolean array) into
+    a 1d boolean vector over the model's in-mask voxels.
+    """
+    if isinstance(roi, str):
+        roi = nib.load(roi)
+    elif not isinstance(roi, (nib.Nifti1Image, np.ndarray)):
+        raise IOError('Input roi must be a nifti image '
+                      '(nibabel.Nifti1Image), a path to one, or a 1d '
+                      'boolean array of in-mask voxels.')
+
+    if isinstance(roi, np.ndarray):
+        # ROI is already restricted to in-mask voxels
+        roi_vec = np.asarray(roi, dtype=bool).ravel()
+        if roi_vec.size != mask_vec.sum():
+            raise ValueError('Input roi array must have one value per '
+                             'in-mask voxel ({0}); got {1}.'.format(
+                                 mask_vec.sum(), roi_vec.size))
+        return roi_vec
+
+    dset_aff = model.mask.affine
+    if not np.array_equal(roi.affine, dset_aff):
+        raise ValueError('Input roi must have same affine as mask img:'
+                         '\n{0}\n{1}'.format(roi.affine, dset_aff))
+
+    # Load ROI file and get ROI voxels overlapping with brain mask
+    roi_vec = np.asarray(roi.dataobj, dtype=bool).ravel()
+    return roi_vec[mask_vec]
+
+
+def _get_decoding_matrices(model):
+    """
+    Return float32 copies of the model's decoding matrices, cached on the
+    model. Decoding is memory-bound, so halving the element size roughly
+    halves the time of the matrix products, with no meaningful loss of
+    precision for the already-noisy topic posteriors.
+    """
+    p_topic_g_voxel = getattr(model, '_p_topic_g_voxel_f32', None)
+    if p_topic_g_voxel is None:
+        p_topic_g_voxel = model.p_topic_g_voxel_.astype(np.float32)
+        model._p_topic_g_voxel_f32 = p_topic_g_voxel
+
+    p_word_g_topic = getattr(model, '_p_word_g_topic_f32', None)
+    if p_word_g_topic is None:
+        p_word_g_topic = model.p_word_g_topic_.astype(np.float32)
+        model._p_word_g_topic_f32 = p_word_g_topic
+    return p_topic_g_voxel, p_word_g_topic
+
+
 @due.dcite(references.GCLDA_DECODING, description='Citation for GCLDA decoding.')
 def gclda_decode_roi(model, roi, topic_priors=None, prior_weight=1.):
     r"""
@@ -26,9 +105,10 @@ def gclda_decode_roi(model, roi, topic_priors=None, prior_weight=1.):
     ----------
     model : :obj:`nimare.annotate.topic.GCLDAModel`
         Model object needed for decoding.
-    roi : :obj:`nibabel.nifti1.Nifti1Image` or :obj:`str`
+    roi : :obj:`nibabel.nifti1.Nifti1Image`, :obj:`str`, or :obj:`numpy.ndarray`
         Binary image to decode into text. If string, path to a file with
-        the binary image.
+        the binary image. If array, a 1d boolean array with one value per
+        voxel within the model's mask.
     topic_priors : :obj:`numpy.ndarray` of :obj:`float`, optional
         A 1d array of size (n_topics) with values for topic weighting.
         If None, no weighting is done. Default is None.
@@ -76,25 +156,68 @@ def gclda_decode_roi(model, roi, topic_priors=None, prior_weight=1.):
         cognition." PLoS computational biology 13.10 (2017): e1005649.
         https://doi.org/10.1371/journal.pcbi.1005649
     """
-    if isinstance(roi, str):
-        roi = nib.load(roi)
-    elif not isinstance(roi, nib.Nifti1Image):
-        raise IOError('Input roi must be either a nifti image '
-                      '(nibabel.Nifti1Image) or a path to one.')
+    decoded_df, topic_weights = gclda_decode_rois(
+        model, [roi], topic_priors=topic_priors, prior_weight=prior_weight)
+    decoded_df.columns = ['Weight']
+    return decoded_df, topic_weights[0]
 
-    dset_aff = model.mask.affine
-    if not np.array_equal(roi.affine, dset_aff):
-        raise ValueError('Input roi must have same affine as mask img:'
-                         '\n{0}\n{1}'.format(np.array2string(roi.affine),
-                                             np.array2string(dset_aff)))
 
-    # Load ROI file and get ROI voxels overlapping with brain mask
-    mask_vec = model.mask.get_data().ravel().astype(bool)
-    roi_vec = roi.get_data().astype(bool).ravel()
-    roi_vec = roi_vec[mask_vec]
-    roi_idx = np.where(roi_vec)[0]
-    p_topic_g_roi = model.p_topic_g_voxel_[roi_idx, :]  # p(T|V) for voxels in ROI only
-    topic_weights = np.sum(p_topic_g_roi, axis=0)  # Sum across words
+@due.dcite(references.GCLDA_DECODING, description='Citation for GCLDA decoding.')
+def gclda_decode_rois(model, rois, topic_priors=None, prior_weight=1.):
+    """
+    Perform image-to-text decoding for a batch of discrete image inputs
+    (e.g., clusters from a meta-analysis) with the same method as
+    :func:`gclda_decode_roi`, but using matrix-matrix products so that reads
+    of the model's voxel-by-topic matrix are amortized across ROIs.
+
+    Parameters
+    ----------
+    model : :obj:`nimare.annotate.topic.GCLDAModel`
+        Model object needed for decoding.
+    rois : :obj:`list` or (R x V) :obj:`numpy.ndarray`
+        ROIs to decode into text. Either a list where each entry is a
+        binary :obj:`nibabel.nifti1.Nifti1Image`, a path to one, or a 1d
+        boolean array of in-mask voxels; or a 2d boolean array with one row
+        per ROI and one column per in-mask voxel.
+    topic_priors : :obj:`numpy.ndarray` of :obj:`float`, optional
+        A 1d array of size (n_topics) with values for topic weighting.
+        If None, no weighting is done. Default is None.
+    prior_weight : :obj:`float`, optional
+        The weight by which the prior will affect the decoding.
+        Default is 1.
+
+    Returns
+    -------
+    decoded_df : :obj:`pandas.DataFrame`
+        A DataFrame with the word-tokens as index and one column of
+        weights per ROI.
+    topic_weights : (R x T) :obj:`numpy.ndarray` of :obj:`float`
+        The weights of the topics used in decoding, with one row per ROI.
+
+    See Also
+    --------
+    gclda_decode_roi : Single-ROI version of this function.
+    """
+    mask_vec = _get_mask_vec(model)
+    if isinstance(rois, np.ndarray) and rois.ndim == 2:
+        rois_mat = np.asarray(rois, dtype=bool)
+        if rois_mat.shape[1] != mask_vec.sum():
+            raise ValueError('Input rois array must have one column per '
+                             'in-mask voxel ({0}); got {1}.'.format(
+                                 mask_vec.sum(), rois_mat.shape[1]))
+    else:
+        rois_mat = np.array([_roi_to_vec(model, roi, mask_vec)
+                             for roi in rois])
+
+    p_topic_g_voxel, p_word_g_topic = _get_decoding_matrices(model)
+
+    # Sum p(T|V) across voxels in each ROI. For a single sparse ROI,
+    # gathering its rows touches less memory than a product against the
+    # full topic matrix; otherwise the matrix product wins
+    if rois_mat.shape[0] == 1 and rois_mat.mean() <= 0.01:
+        topic_weights = p_topic_g_voxel[rois_mat[0], :].sum(axis=0)[None, :]
+    else:
+        topic_weights = rois_mat.astype(np.float32).dot(p_topic_g_voxel)
     if topic_priors is not None:
         weighted_priors = weight_priors(topic_priors, prior_weight)
         topic_weights *= weighted_priors
@@ -103,58 +226,132 @@ def gclda_decode_roi(model, roi, topic_priors=None, prior_weight=1.):
     # n_word_tokens_per_topic = np.sum(model.n_word_tokens_word_by_topic, axis=0)
     # p_word_g_topic = model.n_word_tokens_word_by_topic / n_word_tokens_per_topic[None, :]
     # p_word_g_topic = np.nan_to_num(p_word_g_topic, 0)
-    word_weights = np.dot(model.p_word_g_topic_, topic_weights)
+    word_weights = topic_weights.dot(p_word_g_topic.T).astype(np.float64)
+    topic_weights = topic_weights.astype(np.float64)
 
-    decoded_df = pd.DataFrame(index=model.vocabulary,
-                              columns=['Weight'], data=word_weights)
+    decoded_df = pd.DataFrame(index=model.vocabulary, data=word_weights.T)
     decoded_df.index.name = 'Term'
     return decoded_df, topic_weights
 
 
-@due.dcite(references.BRAINMAP_DECODING,
-           description='Citation for BrainMap-style decoding.')
-def brainmap_decode(coordinates, annotations, ids, ids2=None, features=None,
-                    frequency_threshold=0.001, u=0.05, correction='fdr_bh'):
+DecodingArrays = namedtuple('DecodingArrays',
+                            ['features_arr', 'id_to_row', 'features'])
+
+
+def prepare_decoding_arrays(annotations, features=None,
+                            frequency_threshold=0.001):
     """
-    Perform image-to-text decoding for discrete image inputs (e.g., regions
-    of interest, significant clusters) according to the BrainMap method [1]_.
+    Precompute the binarized annotation matrix used by
+    :func:`brainmap_decode` and :func:`neurosynth_decode`, so that it can be
+    reused when decoding many samples against the same database.
 
-    References
+    Parameters
     ----------
-    .. [1] Amft, Maren, et al. "Definition and characterization of an extended
-        social-affective default network." Brain Structure and Function 220.2
-        (2015): 1031-1049. https://doi.org/10.1007/s00429-013-0698-0
+    annotations : :obj:`pandas.DataFrame`
+        DataFrame with an 'id' column and one column per label, with
+        label frequencies as values.
+    features : :obj:`list`, optional
+        List of labels to use. If None, all non-id columns are used.
+        Default is None.
+    frequency_threshold : :obj:`float`, optional
+        Threshold at which label frequencies are binarized.
+        Default is 0.001.
+
+    Returns
+    -------
+    prepared : :obj:`DecodingArrays`
+        Named tuple of the binarized study-by-label matrix (uint8), a
+        mapping from study id to matrix row, and the label names. Can be
+        passed to the decoders via their ``prepared`` argument.
     """
     id_cols = ['id', 'study_id', 'contrast_id']
-    dataset_ids = sorted(list(set(coordinates['id'].values)))
-    if ids2 is None:
-        unselected = sorted(list(set(dataset_ids) - set(ids)))
-    else:
-        unselected = ids2[:]
-
     if features is None:
-        features = annotations.columns.values
-        features = [f for f in features if f not in id_cols]
+        features = [f for f in annotations.columns.values if f not in id_cols]
 
     # Binarize with frequency threshold
     features_df = annotations.set_index('id', drop=True)
     features_df = features_df[features].ge(frequency_threshold)
+    features_arr = features_df.to_numpy(dtype=np.uint8)
+    id_to_row = {id_: i for i, id_ in enumerate(features_df.index)}
+    return DecodingArrays(features_arr=features_arr, id_to_row=id_to_row,
+                          features=list(features))
 
-    sel_array = features_df.loc[ids].values
-    unsel_array = features_df.loc[unselected].values
+
+DecodingCounts = namedtuple('DecodingCounts',
+                            ['features', 'n_selected_term',
+                             'n_unselected_term', 'n_selected_noterm',
+                             'n_unselected_noterm', 'n_selected',
+                             'n_unselected', 'features_arr', 'id_to_row'])
+
+
+def _prep_decoding_counts(coordinates, annotations, ids, ids2, features,
+                          frequency_threshold, prepared=None):
+    """
+    Shared setup for :func:`brainmap_decode` and :func:`neurosynth_decode`:
+    resolve the unselected sample, binarize the annotations (or reuse a
+    prepared bundle), and count label occurrences in each sample.
+    """
+    dataset_ids = np.unique(coordinates['id'].values)
+    if ids2 is None:
+        unselected = np.setdiff1d(dataset_ids, ids)
+    else:
+        unselected = ids2[:]
+
+    if prepared is None:
+        prepared = prepare_decoding_arrays(
+            annotations, features=features,
+            frequency_threshold=frequency_threshold)
+    features_arr = prepared.features_arr
+    id_to_row = prepared.id_to_row
+
+    sel_array = features_arr[[id_to_row[id_] for id_ in ids]]
+    unsel_array = features_arr[[id_to_row[id_] for id_ in unselected]]
 
     n_selected = len(ids)
     n_unselected = len(unselected)
 
-    # the number of times any term is used (e.g., if one experiment uses
-    # two terms, that counts twice). Why though?
-    n_exps_across_terms = np.sum(np.sum(features_df))
-
-    n_selected_term = np.sum(sel_array, axis=0)
-    n_unselected_term = np.sum(unsel_array, axis=0)
+    n_selected_term = np.sum(sel_array, axis=0, dtype=np.int32)
+    n_unselected_term = np.sum(unsel_array, axis=0, dtype=np.int32)
 
     n_selected_noterm = n_selected - n_selected_term
     n_unselected_noterm = n_unselected - n_unselected_term
+    return DecodingCounts(features=prepared.features,
+                          n_selected_term=n_selected_term,
+                          n_unselected_term=n_unselected_term,
+                          n_selected_noterm=n_selected_noterm,
+                          n_unselected_noterm=n_unselected_noterm,
+                          n_selected=n_selected, n_unselected=n_unselected,
+                          features_arr=features_arr, id_to_row=id_to_row)
+
+
+@due.dcite(references.BRAINMAP_DECODING,
+           description='Citation for BrainMap-style decoding.')
+def brainmap_decode(coordinates, annotations, ids, ids2=None, features=None,
+                    frequency_threshold=0.001, u=0.05, correction='fdr_bh',
+                    prepared=None):
+    """
+    Perform image-to-text decoding for discrete image inputs (e.g., regions
+    of interest, significant clusters) according to the BrainMap method [1]_.
+
+    References
+    ----------
+    .. [1] Amft, Maren, et al. "Definition and characterization of an extended
+        social-affective default network." Brain Structure and Function 220.2
+        (2015): 1031-1049. https://doi.org/10.1007/s00429-013-0698-0
+    """
+    counts = _prep_decoding_counts(coordinates, annotations, ids, ids2,
+                                   features, frequency_threshold,
+                                   prepared=prepared)
+    features = counts.features
+    n_selected_term = counts.n_selected_term
+    n_unselected_term = counts.n_unselected_term
+    n_selected_noterm = counts.n_selected_noterm
+    n_unselected_noterm = counts.n_unselected_noterm
+    n_selected = counts.n_selected
+
+    # the number of times any term is used (e.g., if one experiment uses
+    # two terms, that counts twice). Why though?
+    n_exps_across_terms = int(counts.features_arr.sum())
 
     n_term = n_selected_term + n_unselected_term
     p_term = n_term / n_exps_across_terms
@@ -162,40 +359,50 @@ def brainmap_decode(coordinates, annotations, ids, ids2=None, features=None,
     n_foci_in_database = coordinates.shape[0]
     p_selected = n_selected / n_foci_in_database
 
-    # I hope there's a way to do this without the for loop
-    n_term_foci = np.zeros(len(features))
-    n_noterm_foci = np.zeros(len(features))
-    for i, term in enumerate(features):
-        term_ids = features_df.loc[features_df[term] == 1].index.values
-        noterm_ids = features_df.loc[features_df[term] == 0].index.values
-        n_term_foci[i] = coordinates['id'].isin(term_ids).sum()
-        n_noterm_foci[i] = coordinates['id'].isin(noterm_ids).sum()
+    # Count foci for each term with a single matrix-vector product instead of
+    # rescanning the coordinates table once per feature
+    foci_per_id = coordinates.groupby('id').size()
+    foci_per_id = foci_per_id.reindex(list(counts.id_to_row), fill_value=0)
+    foci_per_id = foci_per_id.values.astype(np.float64)
+    n_term_foci = foci_per_id.dot(counts.features_arr)
+    n_noterm_foci = foci_per_id.sum() - n_term_foci
 
     p_selected_g_term = n_selected_term / n_term_foci  # probForward
     l_selected_g_term = p_selected_g_term / p_selected  # likelihoodForward
     p_selected_g_noterm = n_selected_noterm / n_noterm_foci
 
-    p_term_g_selected = p_selected_g_term * p_term / p_selected  # probReverse
-    p_term_g_selected = p_term_g_selected / np.sum(p_term_g_selected)  # Normalize
+    p_term_g_selected = l_selected_g_term * p_term  # probReverse
+    p_term_g_selected /= p_term_g_selected.sum()  # Normalize
 
     # Significance testing
     # Forward inference significance is determined with a binomial distribution
-    p_fi = 1 - binom.cdf(k=n_selected_term, n=n_term_foci, p=p_selected)
-    sign_fi = np.sign(n_selected_term - np.mean(n_selected_term)).ravel()  # pylint: disable=no-member
+    # The regularized incomplete beta function is the upper tail of the
+    # binomial distribution, and is more stable for small p-values than
+    # subtracting the CDF from one
+    p_fi = special.betainc(n_selected_term,
+                           np.maximum(n_term_foci - n_selected_term + 1, 1),
+                           p_selected)
+    sign_fi = np.sign(n_selected_term - n_selected_term.mean())  # pylint: disable=no-member
 
     # Two-way chi-square test for specificity of activation
-    cells = np.array([[n_selected_term, n_selected_noterm],  # pylint: disable=no-member
-                      [n_unselected_term, n_unselected_noterm]]).T
+    cells = np.stack([n_selected_term, n_selected_noterm,
+                      n_unselected_term, n_unselected_noterm],
+                     axis=-1).reshape(-1, 2, 2)
     chi2_ri = two_way(cells)
     p_ri = special.chdtrc(1, chi2_ri)
-    sign_ri = np.sign(p_selected_g_term - p_selected_g_noterm).ravel()  # pylint: disable=no-member
+    sign_ri = np.sign(p_selected_g_term - p_selected_g_noterm)  # pylint: disable=no-member
 
     # Ignore rare features
-    p_fi[n_selected_term < 5] = 1.
-    p_ri[n_selected_term < 5] = 1.
+    rare = n_selected_term < 5
+    p_fi[rare] = 1.
+    p_ri[rare] = 1.
 
     # Multiple comparisons correction across features. Separately done for FI and RI.
-    if correction is not None:
+    if correction == 'fdr_bh':
+        p_corr_fi = _fdr_bh(p_fi)
+        p_corr_ri = _fdr_bh(p_ri)
+    elif correction is not None:
+        from statsmodels.sandbox.stats.multicomp import multipletests
         _, p_corr_fi, _, _ = multipletests(p_fi, alpha=u, method=correction,
                                            returnsorted=False)
         _, p_corr_ri, _, _ = multipletests(p_ri, alpha=u, method=correction,
@@ -204,9 +411,10 @@ def brainmap_decode(coordinates, annotations, ids, ids2=None, features=None,
         p_corr_fi = p_fi
         p_corr_ri = p_ri
 
-    # Compute z-values
-    z_corr_fi = p_to_z(p_corr_fi, 'two') * sign_fi
-    z_corr_ri = p_to_z(p_corr_ri, 'two') * sign_ri
+    # Compute two-sided z-values directly through the ndtri ufunc,
+    # clipping the p-values to keep the tails finite
+    z_corr_fi = -special.ndtri(0.5 * np.clip(p_corr_fi, 1e-300, 1 - 1e-16)) * sign_fi
+    z_corr_ri = -special.ndtri(0.5 * np.clip(p_corr_ri, 1e-300, 1 - 1e-16)) * sign_ri
 
     # Effect size
     arr = np.array([p_corr_fi, z_corr_fi, l_selected_g_term,  # pylint: disable=no-member
@@ -222,7 +430,7 @@ def brainmap_decode(coordinates, annotations, ids, ids2=None, features=None,
 @due.dcite(references.NEUROSYNTH, description='Introduces Neurosynth.')
 def neurosynth_decode(coordinates, annotations, ids, ids2=None, features=None,
                       frequency_threshold=0.001, prior=0.5, u=0.05,
-                      correction='fdr_bh'):
+                      correction='fdr_bh', prepared=None):
     """
     Perform discrete functional decoding according to Neurosynth's
     meta-analytic method [1]_. This does not employ correlations between
@@ -238,32 +446,14 @@ def neurosynth_decode(coordinates, annotations, ids, ids2=None, features=None,
         functional neuroimaging data." Nature methods 8.8 (2011): 665.
         https://doi.org/10.1038/nmeth.1635
     """
-    id_cols = ['id', 'study_id', 'contrast_id']
-    dataset_ids = sorted(list(set(coordinates['id'].values)))
-    if ids2 is None:
-        unselected = sorted(list(set(dataset_ids) - set(ids)))
-    else:
-        unselected = ids2[:]
-
-    if features is None:
-        features = annotations.columns.values
-        features = [f for f in features if f not in id_cols]
-
-    # Binarize with frequency threshold
-    features_df = annotations.set_index('id', drop=True)
-    features_df = features_df[features].ge(frequency_threshold)
-
-    sel_array = features_df.loc[ids].values
-    unsel_array = features_df.loc[unselected].values
-
-    n_selected = len(ids)
-    n_unselected = len(unselected)
-
-    n_selected_term = np.sum(sel_array, axis=0)
-    n_unselected_term = np.sum(unsel_array, axis=0)
-
-    n_selected_noterm = n_selected - n_selected_term
-    n_unselected_noterm = n_unselected - n_unselected_term
+    counts = _prep_decoding_counts(coordinates, annotations, ids, ids2,
+                                   features, frequency_threshold,
+                                   prepared=prepared)
+    features = counts.features
+    n_selected_term = counts.n_selected_term
+    n_unselected_term = counts.n_unselected_term
+    n_selected_noterm = counts.n_selected_noterm
+    n_unselected_noterm = counts.n_unselected_noterm
 
     n_term = n_selected_term + n_unselected_term
     n_noterm = n_selected_noterm + n_unselected_noterm
@@ -282,17 +472,22 @@ def neurosynth_decode(coordinates, annotations, ids, ids2=None, features=None,
     # One-way chi-square test for consistency of term frequency across terms
     chi2_fi = one_way(n_selected_term, n_term)
     p_fi = special.chdtrc(1, chi2_fi)
-    sign_fi = np.sign(n_selected_term - np.mean(n_selected_term)).ravel()  # pylint: disable=no-member
+    sign_fi = np.sign(n_selected_term - n_selected_term.mean())  # pylint: disable=no-member
 
     # Two-way chi-square test for specificity of activation
-    cells = np.array([[n_selected_term, n_selected_noterm],  # pylint: disable=no-member
-                      [n_unselected_term, n_unselected_noterm]]).T
+    cells = np.stack([n_selected_term, n_selected_noterm,
+                      n_unselected_term, n_unselected_noterm],
+                     axis=-1).reshape(-1, 2, 2)
     chi2_ri = two_way(cells)
     p_ri = special.chdtrc(1, chi2_ri)
-    sign_ri = np.sign(p_selected_g_term - p_selected_g_noterm).ravel()  # pylint: disable=no-member
+    sign_ri = np.sign(p_selected_g_term - p_selected_g_noterm)  # pylint: disable=no-member
 
     # Multiple comparisons correction across terms. Separately done for FI and RI.
-    if correction is not None:
+    if correction == 'fdr_bh':
+        p_corr_fi = _fdr_bh(p_fi)
+        p_corr_ri = _fdr_bh(p_ri)
+    elif correction is not None:
+        from statsmodels.sandbox.stats.multicomp import multipletests
         _, p_corr_fi, _, _ = multipletests(p_fi, alpha=u, method=correction,
                                            returnsorted=False)
         _, p_corr_ri, _, _ = multipletests(p_ri, alpha=u, method=correction,
@@ -301,9 +496,10 @@ def neurosynth_decode(coordinates, annotations, ids, ids2=None, features=None,
         p_corr_fi = p_fi
         p_corr_ri = p_ri
 
-    # Compute z-values
-    z_corr_fi = p_to_z(p_corr_fi, 'two') * sign_fi
-    z_corr_ri = p_to_z(p_corr_ri, 'two') * sign_ri
+    # Compute two-sided z-values directly through the ndtri ufunc,
+    # clipping the p-values to keep the tails finite
+    z_corr_fi = -special.ndtri(0.5 * np.clip(p_corr_fi, 1e-300, 1 - 1e-16)) * sign_fi
+    z_corr_ri = -special.ndtri(0.5 * np.clip(p_corr_ri, 1e-300, 1 - 1e-16)) * sign_ri
 
     # Effect size
     # est. prob. of brain state described by term finding activation in ROI
@@ -1,6 +1,4 @@
 """Various statistical helper functions"""
-import warnings
-
 import numpy as np
 from scipy import stats
 from scipy.special import ndtri
@@ -24,11 +22,8 @@ def one_way(data, n):
     term = data.astype('float64')
     no_term = n - term
     t_exp = np.mean(term, 0)
-    t_exp = np.array([t_exp, ] * data.shape[0])
     nt_exp = n - t_exp
-    t_mss = (term - t_exp) ** 2 / t_exp
-    nt_mss = (no_term - nt_exp) ** 2 / nt_exp
-    chi2 = t_mss + nt_mss
+    chi2 = (term - t_exp) ** 2 / t_exp + (no_term - nt_exp) ** 2 / nt_exp
     return chi2
 
 
@@ -38,22 +33,18 @@ def two_way(cells):
     dimensions are the contingency table for each of N voxels. Returns an
     array of chi2 values.
     """
-    # Mute divide-by-zero warning for bad voxels since we account for that
-    # later
-    warnings.simplefilter("ignore", RuntimeWarning)
-
     cells = cells.astype('float64')  # Make sure we don't overflow
-    total = np.apply_over_axes(np.sum, cells, [1, 2]).ravel()
-    chi_sq = np.zeros(cells.shape, dtype='float64')
-    for i in range(2):
-        for j in range(2):
-            exp = np.sum(cells[:, i, :], 1).ravel() * \
-                np.sum(cells[:, :, j], 1).ravel() / total
-            bad_vox = np.where(exp == 0)[0]
-            chi_sq[:, i, j] = (cells[:, i, j] - exp) ** 2 / exp
-            chi_sq[bad_vox, i, j] = 1.0  # Set p-value for invalid voxels to 1
-    chi_sq = np.apply_over_axes(np.sum, chi_sq, [1, 2]).ravel()
-    return chi_sq
+    total = cells.sum(axis=(1, 2))
+    row_margins = cells.sum(axis=2)
+    col_margins = cells.sum(axis=1)
+    # Mute divide-by-zero warnings for bad voxels since we account for that
+    # below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exp = row_margins[:, :, None] * col_margins[:, None, :] / \
+            total[:, None, None]
+        chi_sq = (cells - exp) ** 2 / exp
+    chi_sq[exp == 0] = 1.0  # Set p-value for invalid voxels to 1
+    return chi_sq.sum(axis=(1, 2))
 
 
 def pearson(x, y):